@@ -5,15 +5,25 @@ from api.v1.views import app_views
 from flask import jsonify, abort, make_response, request
 
 
-@app_views.route('/orders', methods=['GET'], strict_slashes=False) # type: ignore
-def get_orders():
-    orders = storage.all(Order).values()
+# columns the order list view exposes; the listing query selects only
+# these so no full ORM Order objects are materialized per row.
+_LIST_COLUMNS = (Order.id, Order.customer_id, Order.total_amount,
+                 Order.order_status, Order.created_at)
+
 
-    orders_list = []
+def to_list_dict(row):
+    """Build the list-view dict from a lightweight column row"""
+    return {'id': row.id,
+            'customer_id': row.customer_id,
+            'total_amount': row.total_amount,
+            'order_status': row.order_status,
+            'created_at': row.created_at.isoformat()}
 
-    for order in orders:
-        orders_list.append(order)
-    return jsonify(orders_list)
+
+@app_views.route('/orders', methods=['GET'], strict_slashes=False) # type: ignore
+def get_orders():
+    rows = storage.session.query(*_LIST_COLUMNS).all()
+    return jsonify([to_list_dict(row) for row in rows])
 
 @app_views.route('/orders/<order_id>', methods=['GET', 'DELETE'], strict_slashes=False) # type: ignore
 def get_order(order_id):
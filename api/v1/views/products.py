@@ -41,12 +41,17 @@ def modify_product(product_id):
             if key not in ignore:
                 setattr(product, key, value)
         storage.save()
+        if product.customer:
+            product.customer.invalidate_products_cache()
 
         return make_response(jsonify(product.to_dict()), 200)
 
     if request.method == 'DELETE':
+        customer = product.customer
         storage.delete(product)
         storage.save()
+        if customer:
+            customer.invalidate_products_cache()
         return make_response(jsonify({}), 200)
 
 @app_views.route('/products', methods=['POST'], strict_slashes=False) # type: ignore
@@ -61,6 +66,8 @@ def add_product():
     print(request.get_json())
     product_instance = Product(**data)
     product_instance.save()
+    if product_instance.customer:
+        product_instance.customer.invalidate_products_cache()
 
     return make_response(jsonify(product_instance.to_dict()), 200)
 
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Dump every collection in the database as JSON on stdout"""
+import json
+import sys
+from sqlalchemy import func
+from modules import storage
+from modules.Cart.cart import Cart
+from modules.Cart.cart_item import CartItem
+from modules.Category.category import Category
+from modules.Customer.customer import Customer
+from modules.Order.order import Order
+from modules.Order.order_item import OrderItem
+from modules.Products.product import Product
+from modules.Review.review import Review
+
+
+COLLECTIONS = (('Customers', Customer),
+               ('Categories', Category),
+               ('Products', Product),
+               ('Reviews', Review),
+               ('Carts', Cart),
+               ('CartItems', CartItem),
+               ('Orders', Order),
+               ('OrderItems', OrderItem))
+
+BATCH_SIZE = 1000
+
+
+def dump_collection(name, cls, out=sys.stdout):
+    """
+        Stream one collection as JSON, serializing one object at a
+        time and flushing a single write per batch instead of one
+        print per object. Rows are fetched in yield_per batches so
+        memory stays bounded by the batch size.
+    """
+    count = storage.session.query(func.count(cls.id)).scalar()
+    out.write('=== {} ({}) ===\n'.format(name, count))
+    batch = []
+    for obj in storage.stream(cls):
+        batch.append(json.dumps(obj.to_dict(), indent=2,
+                                ensure_ascii=False, default=str))
+        if len(batch) >= BATCH_SIZE:
+            out.write('\n'.join(batch))
+            out.write('\n')
+            batch.clear()
+    if batch:
+        out.write('\n'.join(batch))
+        out.write('\n')
+
+
+def main():
+    """Dump all collections and close the storage session"""
+    for name, cls in COLLECTIONS:
+        dump_collection(name, cls)
+    storage.close()
+
+
+if __name__ == '__main__':
+    main()
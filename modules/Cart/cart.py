@@ -1,11 +1,20 @@
 #!/usr/bin/env python3
 """Create Cart Class"""
+import uuid
+from datetime import datetime
+import modules
 from modules.baseModel import BaseModel
 from modules.baseModel import Base
+from modules.Cart.cart_item import CartItem
+from modules.Cart.cart_item import to_money
+from modules.Products.product import Product
 from sqlalchemy import Column
 from sqlalchemy import String
-from sqlalchemy import Float
+from sqlalchemy import Integer
+from sqlalchemy import Numeric
 from sqlalchemy import ForeignKey
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import relationship
 
 
@@ -14,16 +23,171 @@ class Cart(BaseModel, Base):
         Cart Class
 
         Attributes:
-            total_price (float): Float type, 0.0 by default
+            total_price (Decimal): Numeric(10, 2) type, 0 by default
+            item_count (int): Integer type, 0 by default
             customer_id (str): String(60) type and ForignKey for customers.id
     """
     __tablename__ = 'carts'
-    total_price = Column(Float, default=0.0)
+    _FIELDS = ('id', 'created_at', 'updated_at', 'total_price',
+               'item_count', 'customer_id')
+    total_price = Column(Numeric(10, 2), default=0)
+    item_count = Column(Integer, default=0)
     customer_id = Column(String(60), ForeignKey("customers.id"), nullable=False)
-    # products = relationship('Product', backref='cart', cascade='delete')
+    cart_items = relationship('CartItem',
+                              backref='cart',
+                              cascade='all, delete-orphan',
+                              passive_deletes=True)
+    # the many-to-one gives the unit of work the customers -> carts
+    # insert ordering that enforced foreign keys require.
+    customer = relationship('Customer')
 
-    # @property
-    # def products(self):
-    #     """
-    #         Return List of products that linked with the customer cart
-    #     """
+    def add_product(self, product_id, quantity=1):
+        """
+            Add a product to the cart with a single
+            INSERT ... ON CONFLICT DO UPDATE statement instead of a
+            read-branch-write sequence. An upsert always adds
+            quantity * unit_price, so the cart totals are adjusted
+            without rereading the item.
+        """
+        product = modules.storage.get(Product, product_id)
+        if not product:
+            return None
+
+        session = modules.storage.session
+        now = datetime.utcnow()
+        unit_price = to_money(product.price)
+        stmt = sqlite_insert(CartItem).values(
+            id=uuid.uuid4().hex,
+            created_at=now,
+            updated_at=now,
+            cart_id=self.id,
+            product_id=product_id,
+            quantity=quantity,
+            unit_price=unit_price,
+            subtotal=to_money(quantity * unit_price)
+        ).on_conflict_do_update(
+            index_elements=['cart_id', 'product_id'],
+            set_={'quantity': CartItem.quantity + quantity,
+                  'subtotal': (CartItem.quantity + quantity) *
+                              CartItem.unit_price,
+                  'updated_at': now})
+        session.execute(stmt)
+        session.expire(self, ['cart_items'])
+        cart_item = session.query(CartItem).filter_by(
+            cart_id=self.id,
+            product_id=product_id).populate_existing().one()
+        # the conflict branch keeps the unit price the item was first
+        # added at, so the total delta must come from that stored
+        # price, not the product's current one.
+        self._apply_total_delta(quantity * to_money(cart_item.unit_price))
+        self.item_count = (self.item_count or 0) + quantity
+        return cart_item
+
+    def update_product_quantity(self, product_id, quantity):
+        """
+            Update the quantity of one cart item, looked up with a
+            direct (cart_id, product_id) query.
+        """
+        if quantity <= 0:
+            return self.remove_product(product_id)
+
+        cart_item = modules.storage.session.query(CartItem).filter_by(
+            cart_id=self.id, product_id=product_id).one_or_none()
+        if not cart_item:
+            return None
+
+        previous_subtotal = cart_item.subtotal
+        previous_quantity = cart_item.quantity
+        cart_item.update_quantity(quantity)
+        self._apply_total_delta(cart_item.subtotal - previous_subtotal)
+        self.item_count = (self.item_count or 0) + \
+            (quantity - previous_quantity)
+        return cart_item
+
+    def remove_product(self, product_id):
+        """
+            Remove a product from the cart with a single
+            DELETE ... WHERE cart_id=? AND product_id=? statement.
+        """
+        removed = modules.storage.session.query(
+            CartItem.subtotal, CartItem.quantity).filter_by(
+                cart_id=self.id, product_id=product_id).one_or_none()
+        if removed is None:
+            return 0
+
+        deleted = modules.storage.session.query(CartItem).filter_by(
+            cart_id=self.id, product_id=product_id).delete(
+                synchronize_session='fetch')
+        if deleted:
+            modules.storage.session.expire(self, ['cart_items'])
+            self._apply_total_delta(-removed.subtotal)
+            self.item_count = (self.item_count or 0) - removed.quantity
+        return deleted
+
+    def clear_cart(self):
+        """
+            Remove every item from the cart with a single
+            DELETE ... WHERE cart_id=? statement.
+        """
+        modules.storage.session.query(CartItem).filter(
+            CartItem.cart_id == self.id).delete(
+                synchronize_session='fetch')
+        self.cart_items.clear()
+        self.total_price = 0
+        self.item_count = 0
+
+    def _apply_total_delta(self, delta):
+        """
+            Adjust the cart total by the delta of one changed item
+            instead of recomputing every subtotal.
+        """
+        self.total_price = to_money(self.total_price) + to_money(delta)
+
+    def calculate_total_price(self):
+        """
+            Recalculate the cart total, only needed on initial cart
+            load or for consistency repair. The sum is pushed to a
+            single SQL aggregate; the Python loop only runs while the
+            session still holds unflushed items for this cart.
+        """
+        session = modules.storage.session
+        pending = [obj for obj in list(session.new) + list(session.dirty)
+                   if isinstance(obj, CartItem) and obj.cart_id == self.id]
+        if pending:
+            # this is the repair path, so trust quantity and
+            # unit_price, not the stored subtotal — and write the
+            # subtotal back when it has drifted, only then marking
+            # the item dirty.
+            total = to_money(0)
+            for cart_item in self.cart_items:
+                subtotal = to_money(cart_item.quantity *
+                                    to_money(cart_item.unit_price))
+                if cart_item.subtotal != subtotal:
+                    cart_item.subtotal = subtotal
+                total += subtotal
+        else:
+            total = session.query(func.coalesce(
+                func.sum(CartItem.quantity * CartItem.unit_price),
+                0)).filter(CartItem.cart_id == self.id).scalar()
+        self.total_price = to_money(total)
+        return self.total_price
+
+    def get_item_count(self):
+        """
+            Return the total quantity of items in the cart, read from
+            the denormalized counter instead of summing the items.
+        """
+        return self.item_count or 0
+
+    def to_dict(self):
+        """Returns dictionary representation of the cart with its
+        items, built from a fixed field list in a single dict"""
+        cart_dict = {key: getattr(self, key) for key in self._FIELDS}
+        cart_dict['__class__'] = 'Cart'
+        cart_dict['created_at'] = self.created_at.isoformat()
+        cart_dict['updated_at'] = self.updated_at.isoformat()
+        cart_dict['total_price'] = float(self.total_price or 0)
+        cart_dict['item_count'] = self.get_item_count()
+        cart_dict['cart_items'] = [cart_item.to_dict()
+                                   for cart_item in self.cart_items]
+        return cart_dict
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Create CartItem Class"""
+from decimal import Decimal
+from modules.baseModel import BaseModel
+from modules.baseModel import Base
+from sqlalchemy import Column
+from sqlalchemy import String
+from sqlalchemy import Integer
+from sqlalchemy import Numeric
+from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import UniqueConstraint
+
+
+_TWO_PLACES = Decimal('0.01')
+
+
+def to_money(value):
+    """
+        Coerce a value to a two-place Decimal for exact money math.
+    """
+    return Decimal(str(value or 0)).quantize(_TWO_PLACES)
+
+
+class CartItem(BaseModel, Base):
+    """
+        CartItem Class
+
+        Attributes:
+            cart_id (str): String(60) type and ForeignKey for carts.id
+            product_id (str): String(60) type and ForeignKey for products.id
+            quantity (int): Integer type, 1 by default
+            unit_price (Decimal): Numeric(10, 2) type, 0 by default
+            subtotal (Decimal): Numeric(10, 2) type, 0 by default
+    """
+    __tablename__ = 'cart_items'
+    __table_args__ = (UniqueConstraint('cart_id', 'product_id',
+                                       name='uq_cart_product'),
+                      Index('ix_cart_items_cart_product',
+                            'cart_id', 'product_id'))
+    # CartItem instances must not be pooled or reused after deletion:
+    # SQLAlchemy ties instance state to the session identity map, and a
+    # recycled instance would carry stale persistence state. Re-adding a
+    # product reuses the existing row via the (cart_id, product_id)
+    # lookup in Cart.add_product instead.
+    _FIELDS = ('id', 'created_at', 'updated_at', 'cart_id',
+               'product_id', 'quantity', 'unit_price', 'subtotal')
+    cart_id = Column(String(60), ForeignKey('carts.id', ondelete='CASCADE'),
+                     nullable=False)
+    product_id = Column(String(60), ForeignKey('products.id'), nullable=False)
+    quantity = Column(Integer, default=1)
+    unit_price = Column(Numeric(10, 2), default=0)
+    subtotal = Column(Numeric(10, 2), default=0)
+
+    def calculate_subtotal(self):
+        """Recalculate the item subtotal from quantity and unit price"""
+        self.subtotal = to_money(self.quantity * to_money(self.unit_price))
+        return self.subtotal
+
+    def update_quantity(self, quantity):
+        """Update the item quantity and recalculate the subtotal"""
+        self.quantity = quantity
+        self.calculate_subtotal()
+
+    def to_dict(self):
+        """Returns dictionary containing the cart item fields,
+        built from a fixed field list in a single dict"""
+        item_dict = {key: getattr(self, key) for key in self._FIELDS}
+        item_dict['__class__'] = 'CartItem'
+        item_dict['created_at'] = self.created_at.isoformat()
+        item_dict['updated_at'] = self.updated_at.isoformat()
+        item_dict['unit_price'] = float(self.unit_price or 0)
+        item_dict['subtotal'] = float(self.subtotal or 0)
+        return item_dict
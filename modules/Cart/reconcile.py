@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Batch reconciliation of cart totals"""
+import modules
+from modules.Cart.cart import Cart
+from modules.Cart.cart_item import CartItem
+from modules.Cart.cart_item import to_money
+from sqlalchemy import bindparam
+from sqlalchemy import select
+from sqlalchemy import update
+
+
+def compute_totals(rows):
+    """
+        Accumulate per-cart totals and item counts from
+        (cart_id, quantity, unit_price) rows in a single pass.
+    """
+    totals = {}
+    counts = {}
+    for cart_id, quantity, unit_price in rows:
+        amount = quantity * to_money(unit_price)
+        totals[cart_id] = totals.get(cart_id, to_money(0)) + amount
+        counts[cart_id] = counts.get(cart_id, 0) + quantity
+    return totals, counts
+
+
+def reconcile_cart_totals():
+    """
+        Recompute total_price and item_count for every cart from its
+        items: one SELECT over cart_items, one executemany UPDATE for
+        carts with items and one UPDATE resetting empty carts, instead
+        of iterating carts through the ORM.
+    """
+    session = modules.storage.session
+    rows = session.execute(select(CartItem.cart_id,
+                                  CartItem.quantity,
+                                  CartItem.unit_price))
+    totals, counts = compute_totals(rows)
+    if totals:
+        session.execute(
+            update(Cart.__table__).where(
+                Cart.__table__.c.id == bindparam('b_id')).values(
+                    total_price=bindparam('b_total'),
+                    item_count=bindparam('b_count')),
+            [{'b_id': cart_id,
+              'b_total': to_money(total),
+              'b_count': counts[cart_id]}
+             for cart_id, total in totals.items()])
+    session.execute(
+        update(Cart.__table__).where(
+            Cart.__table__.c.id.notin_(totals.keys())).values(
+                total_price=0, item_count=0))
+    session.commit()
+    return len(totals)
+
+
+if __name__ == '__main__':
+    print('{} carts reconciled'.format(reconcile_cart_totals()))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Create Category Class"""
+import re
+import modules
+from modules.baseModel import BaseModel
+from modules.baseModel import Base
+from modules.Products.product import Product
+from sqlalchemy import Column
+from sqlalchemy import String
+from sqlalchemy import Boolean
+from sqlalchemy import func
+from sqlalchemy.orm import relationship
+
+
+_SLUG_STRIP = re.compile(r'[^\w\s-]')
+_SLUG_DASH = re.compile(r'[-\s]+')
+
+
+class Category(BaseModel, Base):
+    """
+        Category Class
+
+        Attributes:
+            name (str): String(128) type and can't be null
+            description (str): String(1024) type
+            slug (str): String(128) type, generated from name
+            is_active (bool): Boolean type, True by default
+    """
+    __tablename__ = 'categories'
+    _FIELDS = ('id', 'created_at', 'updated_at', 'name',
+               'description', 'slug', 'is_active')
+    name = Column(String(128), nullable=False)
+    description = Column(String(1024))
+    slug = Column(String(128))
+    is_active = Column(Boolean, nullable=False, default=True)
+    products = relationship('Product',
+                            backref='category',
+                            cascade='delete')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if getattr(self, 'slug', None) is None and \
+                getattr(self, 'name', None) is not None:
+            self.slug = self.generate_slug(self.name)
+
+    @staticmethod
+    def generate_slug(name):
+        """
+            Generate a URL slug from the category name.
+        """
+        slug = _SLUG_STRIP.sub('', name.lower())
+        slug = _SLUG_DASH.sub('-', slug)
+        return slug.strip('-')
+
+    def get_active_products(self):
+        """
+            Return the available products of the category, filtered
+            in SQL instead of checking every product in Python.
+        """
+        return modules.storage.filter(Product, category_id=self.id,
+                                      is_available=True).all()
+
+    def get_active_product_count(self):
+        """
+            Count the available products of the category without
+            materializing any Product objects.
+        """
+        return modules.storage.session.query(
+            func.count(Product.id)).filter_by(
+                category_id=self.id, is_available=True).scalar()
+
+    def is_category_active(self):
+        """
+            Return True if the category is active.
+        """
+        return bool(self.is_active)
+
+    def activate(self):
+        """
+            Mark the category as active.
+        """
+        self.is_active = True
+
+    def deactivate(self):
+        """
+            Mark the category as inactive.
+        """
+        self.is_active = False
+
+    def to_dict(self):
+        """Returns dictionary representation of the category,
+        built from a fixed field list in a single dict"""
+        category_dict = {key: getattr(self, key) for key in self._FIELDS}
+        category_dict['__class__'] = 'Category'
+        category_dict['created_at'] = self.created_at.isoformat()
+        category_dict['updated_at'] = self.updated_at.isoformat()
+        product_count = 0
+        active_product_count = 0
+        for product in self.products:
+            product_count += 1
+            if product.is_available:
+                active_product_count += 1
+        category_dict['product_count'] = product_count
+        category_dict['active_product_count'] = active_product_count
+        return category_dict
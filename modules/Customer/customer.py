@@ -9,8 +9,14 @@ from sqlalchemy import Boolean
 from sqlalchemy import Text
 from sqlalchemy.orm import relationship
 from flask_login import UserMixin
+from weakref import WeakKeyDictionary
 
 
+# memoized product listings, keyed weakly by instance: keeping the
+# cache outside __dict__ means to_dict() can never serialize it, and
+# the entry dies with the identity-mapped instance.
+_products_cache = WeakKeyDictionary()
+
 
 class Customer(UserMixin, BaseModel, Base):
     """
@@ -38,7 +44,11 @@ class Customer(UserMixin, BaseModel, Base):
     
     @property
     def products(self):
-        """Getter for list of all customer products"""
+        """Getter for list of all customer products, memoized on the
+        instance so repeated accesses scan the products only once"""
+        cached = _products_cache.get(self)
+        if cached is not None:
+            return cached
         product_list = []
         all_products = modules.storage.all(Product)
         for product in all_products.values():
@@ -46,4 +56,9 @@ class Customer(UserMixin, BaseModel, Base):
                 product_dict = product.to_dict()
                 product_dict['product_image'] = f'http://127.0.0.1:5000/product_img/{product.id}'
                 product_list.append(product_dict)
-        return product_list
\ No newline at end of file
+        _products_cache[self] = product_list
+        return product_list
+
+    def invalidate_products_cache(self):
+        """Drop the memoized products list after a product change"""
+        _products_cache.pop(self, None)
\ No newline at end of file
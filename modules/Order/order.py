@@ -1,10 +1,46 @@
 #!/usr/bin/env python3
 """Order Class"""
+import json
+import uuid
+from datetime import datetime
+from weakref import WeakKeyDictionary
+import modules
 from modules.baseModel import BaseModel
+from modules.Cart.cart_item import CartItem
+from modules.Order.order_item import OrderItem
+from modules.Order.pricing import PricingCalculator
+from modules.Products.product import Product
 from modules.baseModel import Base
 from sqlalchemy import Column
 from sqlalchemy import String
+from sqlalchemy import Float
+from sqlalchemy import Text
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import insert
+from sqlalchemy.orm import relationship
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+
+    _DECODE_ERRORS = (orjson.JSONDecodeError, TypeError, ValueError)
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+    _DECODE_ERRORS = (json.JSONDecodeError, TypeError, ValueError)
+
+
+# parsed address dicts, keyed weakly by instance: keeping the memo
+# outside __dict__ means BaseModel.to_dict() can never serialize it,
+# and the entry dies with the identity-mapped instance.
+_addr_cache = WeakKeyDictionary()
 
 
 class Order(BaseModel, Base):
@@ -14,9 +50,246 @@ class Order(BaseModel, Base):
         Attributes:
             customer_id(str): String(60) ForeignKey for customer.id and can't be null
             cart_id(str): String(60) ForeginKey for carts.id and can't be null
+            shipping_address(str): Text type, JSON encoded address
+            billing_address(str): Text type, JSON encoded address
+            total_amount(float): Float type, 0.0 by default
+            order_status(str): String(20) type, 'pending' by default
     """
     __tablename__ = 'orders'
+    # status lookups are hot on listing pages: build the display map,
+    # the membership set and the error message once at class creation.
+    _STATUS_MAP = {'pending': 'Pending Payment',
+                   'confirmed': 'Confirmed',
+                   'processing': 'Processing',
+                   'shipped': 'Shipped',
+                   'delivered': 'Delivered',
+                   'cancelled': 'Cancelled',
+                   'refunded': 'Refunded'}
+    _VALID_STATUSES = frozenset(_STATUS_MAP)
+    _VALID_STATUSES_MSG = ', '.join(sorted(_STATUS_MAP))
+    _CANCELLABLE_STATUSES = frozenset(('pending', 'confirmed', 'processing'))
     customer_id = Column(String(60), ForeignKey('customers.id'), nullable=False)
     cart_id = Column(String(60), ForeignKey('carts.id'))
+    shipping_address = Column(Text)
+    billing_address = Column(Text)
+    total_amount = Column(Float, default=0.0)
+    order_status = Column(String(20), default='pending')
+    order_items = relationship('OrderItem',
+                               backref='order',
+                               cascade='all, delete-orphan',
+                               passive_deletes=True,
+                               lazy='selectin')
+    # the many-to-one gives the unit of work the customers -> orders
+    # insert ordering that enforced foreign keys require.
+    customer = relationship('Customer')
+
+    @classmethod
+    def from_cart(cls, cart):
+        """
+            Create an order from a cart. The cart lines are read with
+            one column query and inserted through the bulk path, so a
+            K item cart converts in a fixed number of statements
+            instead of two per item.
+        """
+        order = cls(customer_id=cart.customer_id, cart_id=cart.id)
+        modules.storage.new(order)
+        items = modules.storage.session.query(
+            CartItem.product_id, CartItem.quantity).filter_by(
+                cart_id=cart.id).all()
+        order.bulk_add_order_items(items)
+        return order
+
+    def add_order_item(self, product_id, quantity=1, product=None):
+        """
+            Add one line item to the order. Callers that already hold
+            the Product (e.g. after a batched IN-clause prefetch) pass
+            it in to skip the per-item lookup.
+        """
+        if product is None:
+            product = modules.storage.get(Product, product_id)
+        if not product:
+            return None
+
+        order_item = OrderItem(order_id=self.id,
+                               product_id=product_id,
+                               quantity=quantity,
+                               unit_price=product.price)
+        modules.storage.new(order_item)
+        self.calculate_total_amount()
+        return order_item
+
+    def bulk_add_order_items(self, items):
+        """
+            Add many line items at once. `items` is a list of
+            (product_id, quantity) pairs; products are validated with
+            a single IN-clause query, the rows inserted with one
+            multi-row INSERT and the total recomputed once, instead of
+            one round-trip per item.
+        """
+        session = modules.storage.session
+        product_ids = [product_id for product_id, quantity in items]
+        price_map = dict(session.query(Product.id, Product.price).filter(
+            Product.id.in_(product_ids)).all())
+        now = datetime.utcnow()
+        rows = []
+        for product_id, quantity in items:
+            unit_price = price_map.get(product_id)
+            if unit_price is None:
+                continue
+            rows.append({'id': uuid.uuid4().hex,
+                         'created_at': now,
+                         'updated_at': now,
+                         'order_id': self.id,
+                         'product_id': product_id,
+                         'quantity': quantity,
+                         'unit_price': unit_price})
+        if rows:
+            session.execute(insert(OrderItem), rows)
+            session.expire(self, ['order_items'])
+            self.calculate_total_amount()
+        return len(rows)
+
+    def remove_order_item(self, product_id):
+        """
+            Remove one line item from the order with a single
+            DELETE ... WHERE order_id=? AND product_id=? statement,
+            without materializing the item rows.
+        """
+        session = modules.storage.session
+        result = session.execute(delete(OrderItem).where(
+            OrderItem.order_id == self.id,
+            OrderItem.product_id == product_id))
+        if result.rowcount:
+            session.expire(self, ['order_items'])
+            self.calculate_total_amount()
+            return True
+        return False
+
+    def calculate_total_amount(self):
+        """
+            Recalculate the order total. The sum is pushed to a single
+            SQL aggregate; the builtin sum() fallback only runs while
+            the session holds unflushed items for this order.
+        """
+        session = modules.storage.session
+        pending = [obj for obj in list(session.new) + list(session.dirty)
+                   if isinstance(obj, OrderItem) and
+                   obj.order_id == self.id]
+        if pending:
+            # reloading the collection autoflushes the pending items
+            # so the fallback sum sees them.
+            session.expire(self, ['order_items'])
+            total = sum(item.subtotal for item in self.order_items)
+        else:
+            total = session.query(func.coalesce(
+                func.sum(OrderItem.quantity * OrderItem.unit_price),
+                0.0)).filter(OrderItem.order_id == self.id).scalar()
+        self.total_amount = round(float(total), 2)
+        return self.total_amount
+
+    def get_order_status_display(self):
+        """
+            Return the human readable label of the order status.
+        """
+        return self._STATUS_MAP.get(self.order_status, self.order_status)
+
+    def update_order_status(self, new_status):
+        """
+            Set the order status after an O(1) membership check.
+        """
+        if new_status not in self._VALID_STATUSES:
+            raise ValueError('Invalid status {}, must be one of: {}'.format(
+                new_status, self._VALID_STATUSES_MSG))
+        self.order_status = new_status
+        return True
+
+    def calculate_pricing(self):
+        """
+            Compute subtotal, tax and shipping for the order. The
+            loaded items are handed to the calculator as two parallel
+            arrays so no per-item dicts are allocated.
+        """
+        items = self.order_items
+        return PricingCalculator.calculate_order_total(
+            [item.quantity for item in items],
+            [item.unit_price for item in items])
+
+    def get_item_count(self):
+        """
+            Return the total quantity of items in the order.
+        """
+        return sum(item.quantity for item in self.order_items)
+
+    def can_cancel(self):
+        """
+            Return True while the order has not shipped yet.
+        """
+        return self.order_status in self._CANCELLABLE_STATUSES
+
+    def to_dict(self):
+        """Returns dictionary representation of the order with its
+        items, item count and computed status fields, built in one
+        pass over the items"""
+        order_dict = super().to_dict()
+        item_count = 0
+        items = []
+        for order_item in self.order_items:
+            item_count += order_item.quantity
+            items.append(order_item.to_dict())
+        order_dict['order_items'] = items
+        order_dict['item_count'] = item_count
+        order_dict['order_status_display'] = self.get_order_status_display()
+        order_dict['can_cancel'] = self.can_cancel()
+        return order_dict
+
+    def _parse_address(self, raw):
+        """
+            Parse a JSON address, memoized per instance so repeated
+            serializations do not re-parse the same string.
+        """
+        cache = _addr_cache.get(self)
+        if cache is None:
+            cache = _addr_cache[self] = {}
+        if raw in cache:
+            return cache[raw]
+        try:
+            parsed = _loads(raw)
+        except _DECODE_ERRORS:
+            parsed = {}
+        cache[raw] = parsed
+        return parsed
+
+    def set_shipping_address(self, address):
+        """
+            Store the shipping address dict as JSON
+        """
+        _addr_cache.get(self, {}).pop(self.shipping_address, None)
+        self.shipping_address = _dumps(address)
+
+    def get_shipping_address_dict(self):
+        """
+            Return the shipping address as a dict
+        """
+        if not self.shipping_address:
+            return {}
+        return self._parse_address(self.shipping_address)
+
+    def set_billing_address(self, address):
+        """
+            Store the billing address dict as JSON
+        """
+        _addr_cache.get(self, {}).pop(self.billing_address, None)
+        self.billing_address = _dumps(address)
+
+    def get_billing_address_dict(self):
+        """
+            Return the billing address as a dict
+        """
+        if not self.billing_address:
+            return {}
+        return self._parse_address(self.billing_address)
 
 
+# the status summary and by-status listings group and filter on this
+# column; indexed, both resolve without scanning the table.
+Index('ix_orders_status', Order.order_status)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Create OrderItem Class"""
+from modules.baseModel import BaseModel
+from modules.baseModel import Base
+from sqlalchemy import Column
+from sqlalchemy import String
+from sqlalchemy import Integer
+from sqlalchemy import Float
+from sqlalchemy import Computed
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import relationship
+
+
+class OrderItem(BaseModel, Base):
+    """
+        OrderItem Class
+
+        Attributes:
+            order_id (str): String(60) type and ForeignKey for orders.id
+            product_id (str): String(60) type and ForeignKey for products.id
+            quantity (int): Integer type, 1 by default
+            unit_price (float): Float type, 0.0 by default
+            subtotal (float): stored column computed by the database
+    """
+    __tablename__ = 'order_items'
+    order_id = Column(String(60), ForeignKey('orders.id', ondelete='CASCADE'),
+                      nullable=False)
+    product_id = Column(String(60), ForeignKey('products.id'), nullable=False)
+    quantity = Column(Integer, default=1)
+    unit_price = Column(Float, default=0.0)
+    subtotal = Column(Float, Computed('quantity * unit_price',
+                                      persisted=True))
+    # joined eager load: serializing an order's items must not fire
+    # one lazy SELECT per product.
+    product = relationship('Product', lazy='joined')
+
+    def update_quantity(self, quantity):
+        """Update the item quantity, the database recomputes the
+        stored subtotal on flush"""
+        self.quantity = quantity
+
+    def to_dict(self):
+        """Returns dictionary representation of the order item"""
+        item_dict = super().to_dict()
+        if self.product:
+            item_dict['product_name'] = self.product.product_name
+        return item_dict
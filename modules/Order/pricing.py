@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Order pricing helpers"""
+
+
+def _reduce(quantities, prices):
+    """
+        Dot-product reduction over the parallel quantity/price
+        sequences. A free function of plain sequences so the inner
+        loop binds only locals — no class attribute or dict lookups
+        per item.
+    """
+    subtotal = 0.0
+    for quantity, price in zip(quantities, prices):
+        subtotal += quantity * price
+    return subtotal
+
+
+class PricingCalculator:
+    """
+        Compute order pricing (subtotal, tax, shipping) from order
+        line data.
+    """
+    TAX_RATE = 0.1
+    FREE_SHIPPING_THRESHOLD = 100.0
+    SHIPPING_FLAT_RATE = 9.99
+
+    @classmethod
+    def calculate_order_total(cls, quantities, unit_prices):
+        """
+            Calculate pricing from two parallel sequences of
+            quantities and unit prices, fusing the subtotal reduction
+            into one pass without building per-item dicts.
+        """
+        subtotal = _reduce(quantities, unit_prices)
+        tax = subtotal * cls.TAX_RATE
+        if subtotal == 0 or subtotal >= cls.FREE_SHIPPING_THRESHOLD:
+            shipping = 0.0
+        else:
+            shipping = cls.SHIPPING_FLAT_RATE
+        return {'subtotal': round(subtotal, 2),
+                'tax': round(tax, 2),
+                'shipping': round(shipping, 2),
+                'total': round(subtotal + tax + shipping, 2)}
+
+    @classmethod
+    def calculate_order_total_from_items(cls, items_data):
+        """
+            Convenience wrapper accepting a list of dicts with
+            'quantity' and 'unit_price' keys.
+        """
+        return cls.calculate_order_total(
+            [item['quantity'] for item in items_data],
+            [item['unit_price'] for item in items_data])
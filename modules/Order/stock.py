@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Stock reservation helpers"""
+import modules
+from modules.Products.product import Product
+from sqlalchemy import case
+
+
+class StockManager:
+    """
+        StockManager Class:
+            Reserve and release product stock as orders move through
+            the workflow. All adjustments run as guarded UPDATEs so
+            concurrent reservations can never oversell a product.
+    """
+    @property
+    def db_session(self):
+        """Return the shared storage session"""
+        return modules.storage.session
+
+    def reserve_stock(self, product_id, quantity, order_id=None):
+        """
+            Take quantity units of a product with one atomic guarded
+            UPDATE; returns False when the product is missing,
+            unavailable or short on stock.
+        """
+        updated = self.db_session.query(Product).filter(
+            Product.id == product_id,
+            Product.is_available.is_(True),
+            Product.stock_quantity >= quantity).update(
+                {Product.stock_quantity:
+                 Product.stock_quantity - quantity},
+                synchronize_session=False)
+        return bool(updated)
+
+    def release_stock(self, product_id, quantity, order_id=None):
+        """
+            Return quantity units of a product to stock and flip it
+            back to available, with one atomic UPDATE.
+        """
+        updated = self.db_session.query(Product).filter(
+            Product.id == product_id).update(
+                {Product.stock_quantity:
+                 Product.stock_quantity + quantity,
+                 Product.is_available: True},
+                synchronize_session=False)
+        return bool(updated)
+
+    @staticmethod
+    def _sum_quantities(items):
+        """Fold (product_id, quantity, ...) items per product"""
+        quantities = {}
+        for product_id, quantity, *rest in items:
+            quantities[product_id] = quantities.get(product_id, 0) + \
+                quantity
+        return quantities
+
+    def reserve_stock_bulk(self, items):
+        """
+            Reserve stock for many (product_id, quantity, order_id)
+            items at once: one IN-clause SELECT validates every line,
+            then a single CASE-dispatched UPDATE takes all the stock,
+            guarded per product by the same stock_quantity >= quantity
+            predicate reserve_stock uses. When a concurrent writer
+            takes stock between check and take, the guard drops that
+            row, the savepoint-wrapped UPDATE is rolled back and the
+            whole check-and-take retried against the new state — so
+            no line can ever oversell. Returns the list of product
+            ids that could not be reserved, empty on success; nothing
+            is changed when any line fails.
+        """
+        quantities = self._sum_quantities(items)
+        if not quantities:
+            return []
+        session = self.db_session
+        needed = case(quantities, value=Product.id)
+        while True:
+            rows = session.query(
+                Product.id, Product.stock_quantity,
+                Product.is_available).filter(
+                    Product.id.in_(quantities)).all()
+            available = {product_id: stock or 0
+                         for product_id, stock, is_available in rows
+                         if is_available}
+            failures = [product_id for product_id, quantity
+                        in quantities.items()
+                        if available.get(product_id, 0) < quantity]
+            if failures:
+                return failures
+            nested = session.begin_nested()
+            updated = session.query(Product).filter(
+                Product.id.in_(quantities),
+                Product.is_available.is_(True),
+                Product.stock_quantity >= needed).update(
+                    {Product.stock_quantity:
+                     Product.stock_quantity - needed},
+                    synchronize_session=False)
+            if updated == len(quantities):
+                nested.commit()
+                return []
+            # a concurrent writer moved stock after the check: undo
+            # the partial take and re-validate against what is left.
+            nested.rollback()
+
+    def release_stock_bulk(self, items):
+        """
+            Return stock for many (product_id, quantity, order_id)
+            items with one CASE-dispatched UPDATE, flipping the
+            products back to available.
+        """
+        quantities = self._sum_quantities(items)
+        if not quantities:
+            return 0
+        return self.db_session.query(Product).filter(
+            Product.id.in_(quantities)).update(
+                {Product.stock_quantity: Product.stock_quantity +
+                 case(quantities, value=Product.id),
+                 Product.is_available: True},
+                synchronize_session=False)
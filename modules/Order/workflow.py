@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""Order status workflow"""
+import atexit
+import sys
+import threading
+import time
+from array import array
+from collections import deque
+from enum import Enum
+from types import MappingProxyType
+import modules
+from modules.Order.order import Order
+from modules.Order.stock import StockManager
+from sqlalchemy import func
+
+
+class OrderStatus(Enum):
+    """The order lifecycle states, mirroring Order._STATUS_MAP"""
+    PENDING = 'pending'
+    CONFIRMED = 'confirmed'
+    PROCESSING = 'processing'
+    SHIPPED = 'shipped'
+    DELIVERED = 'delivered'
+    CANCELLED = 'cancelled'
+    REFUNDED = 'refunded'
+
+
+# the legal moves of the order state machine; anything absent here is
+# rejected.
+VALID_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.CONFIRMED, OrderStatus.CANCELLED},
+    OrderStatus.CONFIRMED: {OrderStatus.PROCESSING,
+                            OrderStatus.CANCELLED},
+    OrderStatus.PROCESSING: {OrderStatus.SHIPPED,
+                             OrderStatus.CANCELLED},
+    OrderStatus.SHIPPED: {OrderStatus.DELIVERED},
+    OrderStatus.DELIVERED: {OrderStatus.REFUNDED},
+    OrderStatus.CANCELLED: set(),
+    OrderStatus.REFUNDED: set(),
+}
+
+# states with no way out, and states during which stock is held.
+TERMINAL_STATUSES = {OrderStatus.CANCELLED, OrderStatus.REFUNDED}
+STOCK_RESERVED_STATUSES = {OrderStatus.CONFIRMED,
+                           OrderStatus.PROCESSING, OrderStatus.SHIPPED}
+
+# the same sets over the raw strings the database stores: membership
+# tests against order.order_status then hash the string directly,
+# with no per-check .value unwrapping or list rebuild. frozenset
+# membership is a single interned-string hash probe.
+TERMINAL_STATUSES_STR = frozenset(
+    status.value for status in TERMINAL_STATUSES)
+STOCK_RESERVED_STATUSES_STR = frozenset(
+    status.value for status in STOCK_RESERVED_STATUSES)
+CANCEL_FROM_STATUSES_STR = frozenset(
+    {OrderStatus.CONFIRMED.value, OrderStatus.PROCESSING.value})
+
+# the transition table folded into one integer: bit (current*8 +
+# target) is set iff the move is legal, with statuses numbered in
+# declaration order. A validity check is then two dict lookups on the
+# raw strings plus a shift and mask — no Enum construction, no set,
+# no exception guard.
+_STATUS_VALUES = tuple(status.value for status in OrderStatus)
+_STATUS_IDX = {value: index
+               for index, value in enumerate(_STATUS_VALUES)}
+_TRANSITION_BITS = 0
+for _current, _targets in VALID_TRANSITIONS.items():
+    for _target in _targets:
+        _TRANSITION_BITS |= 1 << (_STATUS_IDX[_current.value] * 8 +
+                                  _STATUS_IDX[_target.value])
+del _current, _targets, _target
+
+# read-only all-zero summary, copied as the base of every summary so
+# the dict of statuses is never rebuilt from the Enum per call.
+_ZERO_SUMMARY = MappingProxyType(
+    {status.value: 0 for status in OrderStatus})
+
+# bumped on every committed transition; a cached summary tagged with
+# an older version is stale no matter how fresh its timestamp.
+_status_version = 0
+
+
+def _bump_status_version():
+    """Invalidate cached status summaries"""
+    global _status_version
+    _status_version += 1
+
+
+# audit trail buffer: a transition appends one string (deque appends
+# are atomic under the GIL, no lock) and a daemon thread drains the
+# queue in batches with one write each, so bulk transitions never
+# wait on stdio.
+_log_queue = deque()
+_LOG_BATCH = 1000
+_LOG_IDLE_SLEEP = 0.05
+
+
+def _drain_log_queue():
+    """Write out one batch of buffered entries; returns the count"""
+    batch = []
+    while _log_queue and len(batch) < _LOG_BATCH:
+        try:
+            batch.append(_log_queue.popleft())
+        except IndexError:
+            break
+    if batch:
+        sys.stdout.write('\n'.join(batch) + '\n')
+    return len(batch)
+
+
+def flush_status_log():
+    """Drain the audit buffer completely — shutdown and tests"""
+    total = 0
+    while _log_queue:
+        total += _drain_log_queue()
+    return total
+
+
+def _log_flusher():
+    """Flusher loop of the audit thread"""
+    while True:
+        if not _drain_log_queue():
+            time.sleep(_LOG_IDLE_SLEEP)
+
+
+threading.Thread(target=_log_flusher, name='order-status-log',
+                 daemon=True).start()
+atexit.register(flush_status_log)
+
+
+def bulk_results_as_dicts(result):
+    """
+        Lazily rebuild the per-order dict shape from a columnar
+        bulk_transition_orders result; nothing is allocated for rows
+        the caller never reaches.
+    """
+    for order_id, ok, message, previous, current in zip(
+            result['order_ids'], result['success'],
+            result['messages'], result['previous_status'],
+            result['current_status']):
+        yield {'order_id': order_id, 'success': bool(ok),
+               'message': message, 'previous_status': previous,
+               'current_status': current}
+
+
+class OrderWorkflowManager:
+    """
+        OrderWorkflowManager Class:
+            Drive orders through the status state machine, reserving
+            and releasing stock on the transitions that need it.
+    """
+    # dashboards poll the summary; identical results within this
+    # window are served from the instance cache.
+    SUMMARY_TTL = 2.0
+
+    def __init__(self):
+        self.stock_manager = StockManager()
+        self._summary_cache = (0.0, -1, None)
+        self._handlers = self._build_transition_handlers()
+
+    def _build_transition_handlers(self):
+        """
+            Specialize the pre-transition side effects per legal
+            (current, new) pair: each handler closure contains only
+            the work its pair needs, with the stock manager bound in,
+            so the per-transition dispatch is one dict lookup and a
+            straight-line body instead of re-deciding the same status
+            comparisons on every call.
+        """
+        stock_manager = self.stock_manager
+
+        def no_actions(order, order_items):
+            return True, []
+
+        def reserve(order, order_items):
+            items = [(item.product_id, item.quantity, order.id)
+                     for item in order_items]
+            failures = stock_manager.reserve_stock_bulk(items)
+            if failures:
+                return (False,
+                        'Insufficient stock for product {}'.format(
+                            failures[0]))
+            return True, ['reserved {}x {}'.format(quantity, product_id)
+                          for product_id, quantity, order_id in items]
+
+        def release(order, order_items):
+            items = [(item.product_id, item.quantity, order.id)
+                     for item in order_items]
+            stock_manager.release_stock_bulk(items)
+            return True, ['released {}x {}'.format(quantity, product_id)
+                          for product_id, quantity, order_id in items]
+
+        handlers = {(current.value, target.value): no_actions
+                    for current, targets in VALID_TRANSITIONS.items()
+                    for target in targets}
+        handlers[(OrderStatus.PENDING.value,
+                  OrderStatus.CONFIRMED.value)] = reserve
+        for current in CANCEL_FROM_STATUSES_STR:
+            handlers[(current, OrderStatus.CANCELLED.value)] = release
+        handlers[(OrderStatus.DELIVERED.value,
+                  OrderStatus.REFUNDED.value)] = release
+        return handlers
+
+    @property
+    def db_session(self):
+        """Return the shared storage session"""
+        return modules.storage.session
+
+    def can_transition_to(self, current_status, new_status):
+        """
+            Return True if the state machine allows moving from
+            current_status to new_status: a branchless probe of the
+            transition bit matrix; unknown statuses simply miss the
+            index map.
+        """
+        current = _STATUS_IDX.get(current_status)
+        target = _STATUS_IDX.get(new_status)
+        return current is not None and target is not None and \
+            _TRANSITION_BITS >> (current * 8 + target) & 1 == 1
+
+    def get_valid_transitions(self, current_status):
+        """
+            Return the status strings reachable from current_status,
+            decoded from the matrix row of the status.
+        """
+        current = _STATUS_IDX.get(current_status)
+        if current is None:
+            return []
+        row = _TRANSITION_BITS >> (current * 8) & 0xFF
+        return [value for index, value in enumerate(_STATUS_VALUES)
+                if row >> index & 1]
+
+    def transition_order_status(self, order_id, new_status,
+                                current_status=None):
+        """
+            Move one order to new_status, running the stock side
+            effects the transition requires. Returns a result dict
+            with 'success', 'message', 'previous_status' and
+            'current_status' keys. A caller that already knows the
+            order's status can pass it as current_status: illegal
+            transitions are then rejected from the bitset alone,
+            before the SELECT is ever issued.
+        """
+        if (current_status is not None and
+                not self.can_transition_to(current_status, new_status)):
+            return {'success': False,
+                    'message': 'Cannot transition from {} to {}'.format(
+                        current_status, new_status),
+                    'previous_status': current_status,
+                    'current_status': current_status}
+        session = self.db_session
+        order = session.get(Order, order_id)
+        if order is None:
+            return {'success': False, 'message': 'Order not found',
+                    'previous_status': None, 'current_status': None}
+        # snapshot the status and items once: every further mapped-
+        # attribute read risks an autoflush or expired-attribute
+        # refresh mid-transition.
+        current_status = order.order_status
+        if not self.can_transition_to(current_status, new_status):
+            return {'success': False,
+                    'message': 'Cannot transition from {} to {}'.format(
+                        current_status, new_status),
+                    'previous_status': current_status,
+                    'current_status': current_status}
+        order_items = list(order.order_items)
+        ok, detail = self._handle_pre_transition_actions(
+            order, new_status, current_status, order_items)
+        if not ok:
+            return {'success': False, 'message': detail,
+                    'previous_status': current_status,
+                    'current_status': current_status}
+        order.order_status = new_status
+        session.commit()
+        _bump_status_version()
+        self._log_status_change(order.id, current_status, new_status)
+        return {'success': True, 'message': 'Order status updated',
+                'previous_status': current_status,
+                'current_status': new_status,
+                'actions_performed': detail}
+
+    def bulk_transition_orders(self, order_ids, new_status,
+                               status_hints=None):
+        """
+            Move many orders to new_status at once. The orders are
+            fetched with one IN-clause SELECT, transitions validated
+            in process, the status change applied with one UPDATE and
+            everything committed once — a fixed number of round-trips
+            however large the batch. status_hints is an optional
+            {order_id: status} dict of statuses the caller already
+            holds; hinted orders whose transition is illegal are
+            rejected from the bitset and dropped from the SELECT, so
+            a batch dominated by already-terminal orders never loads
+            them.
+
+            Results are columnar: parallel 'order_ids', 'success' (a
+            compact byte array of 0/1), 'messages', 'previous_status'
+            and 'current_status' sequences plus the two counts —
+            five list slots per order instead of a dict of dicts.
+            bulk_results_as_dicts() rebuilds the per-order dict shape
+            lazily for callers that want it.
+        """
+        skipped = {}
+        if status_hints:
+            for order_id in order_ids:
+                hinted = status_hints.get(order_id)
+                if (hinted is not None and
+                        not self.can_transition_to(hinted, new_status)):
+                    skipped[order_id] = hinted
+        fetch_ids = ([order_id for order_id in order_ids
+                      if order_id not in skipped]
+                     if skipped else order_ids)
+        session = self.db_session
+        orders = {order.id: order for order in
+                  session.query(Order).filter(
+                      Order.id.in_(fetch_ids)).all()}
+        success = array('B')
+        messages = []
+        previous_statuses = []
+        current_statuses = []
+        transitioned = []
+        for order_id in order_ids:
+            hinted = skipped.get(order_id)
+            if hinted is not None:
+                success.append(0)
+                messages.append(
+                    'Cannot transition from {} to {}'.format(
+                        hinted, new_status))
+                previous_statuses.append(hinted)
+                current_statuses.append(hinted)
+                continue
+            order = orders.get(order_id)
+            if order is None:
+                success.append(0)
+                messages.append('Order not found')
+                previous_statuses.append(None)
+                current_statuses.append(None)
+                continue
+            current_status = order.order_status
+            previous_statuses.append(current_status)
+            if not self.can_transition_to(current_status, new_status):
+                success.append(0)
+                messages.append(
+                    'Cannot transition from {} to {}'.format(
+                        current_status, new_status))
+                current_statuses.append(current_status)
+                continue
+            ok, detail = self._handle_pre_transition_actions(
+                order, new_status, current_status,
+                list(order.order_items))
+            if not ok:
+                success.append(0)
+                messages.append(detail)
+                current_statuses.append(current_status)
+                continue
+            success.append(1)
+            messages.append('Order status updated')
+            current_statuses.append(new_status)
+            transitioned.append((order, current_status))
+        if transitioned:
+            session.query(Order).filter(Order.id.in_(
+                [order.id for order, _ in transitioned])).update(
+                    {Order.order_status: new_status},
+                    synchronize_session=False)
+        session.commit()
+        if transitioned:
+            _bump_status_version()
+        for order, previous_status in transitioned:
+            session.expire(order, ['order_status'])
+            self._log_status_change(order.id, previous_status,
+                                    new_status)
+        successful = len(transitioned)
+        return {'order_ids': list(order_ids),
+                'success': success,
+                'messages': messages,
+                'previous_status': previous_statuses,
+                'current_status': current_statuses,
+                'successful_transitions': successful,
+                'failed_transitions': len(messages) - successful}
+
+    def get_order_status_summary(self):
+        """
+            Return {status: order count} for every status. The
+            grouped query walks the orders status index; its result
+            is cached for SUMMARY_TTL seconds and dropped early when
+            a transition bumps the status version.
+        """
+        now = time.monotonic()
+        timestamp, version, cached = self._summary_cache
+        if cached is not None and version == _status_version and \
+                now - timestamp < self.SUMMARY_TTL:
+            return dict(cached)
+        summary = dict(_ZERO_SUMMARY)
+        summary.update(self.db_session.query(
+            Order.order_status, func.count()).group_by(
+                Order.order_status).all())
+        self._summary_cache = (now, _status_version, summary)
+        return dict(summary)
+
+    def get_orders_by_status(self, status, limit=None):
+        """
+            Return the orders currently in a status as a list of
+            plain dicts. A column-only query streamed in fixed
+            batches: no Order instance is hydrated, no identity-map
+            bookkeeping runs, and peak memory stays at one batch of
+            rows however large the status bucket.
+        """
+        query = self.db_session.query(
+            Order.id, Order.customer_id, Order.total_amount,
+            Order.order_status, Order.created_at,
+            Order.updated_at).filter(Order.order_status == status)
+        if limit:
+            query = query.limit(limit)
+        return [{'order_id': row[0],
+                 'customer_id': row[1],
+                 'total_amount': row[2],
+                 'order_status': row[3],
+                 'created_at': row[4].isoformat() if row[4] else None,
+                 'updated_at': row[5].isoformat() if row[5] else None}
+                for row in query.yield_per(1000)]
+
+    def validate_order_business_rules(self, order):
+        """
+            Check the invariants a transition-eligible order must
+            hold; returns a dict with 'valid' and 'errors' keys.
+        """
+        errors = []
+        if order.order_status in TERMINAL_STATUSES_STR:
+            errors.append('order: order is in a terminal status')
+        if not order.order_items:
+            errors.append('order_items: order has no items')
+        if (order.total_amount or 0) < 0:
+            errors.append('total_amount: must not be negative')
+        return {'valid': not errors, 'errors': errors}
+
+    def _handle_pre_transition_actions(self, order, new_status,
+                                       current_status=None,
+                                       order_items=None):
+        """
+            Dispatch to the specialized handler of the (current,
+            new) pair. Callers that already snapshotted the status
+            and items pass them in so this never re-reads the mapped
+            attributes. Returns (ok, detail) where detail is the
+            performed-action list, or the error message when ok is
+            False.
+        """
+        if current_status is None:
+            current_status = order.order_status
+        if order_items is None:
+            order_items = order.order_items
+        handler = self._handlers.get((current_status, new_status))
+        if handler is None:
+            return True, []
+        return handler(order, order_items)
+
+    def _log_status_change(self, order_id, old_status, new_status):
+        """Buffer one status change for the audit flusher — an O(1)
+        append, no I/O on the transition path"""
+        _log_queue.append('[order workflow] {}: {} -> {}'.format(
+            order_id, old_status, new_status))
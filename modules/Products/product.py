@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """Create Product Class"""
+import modules
 from modules.baseModel import BaseModel
 from modules.baseModel import Base
 from sqlalchemy import String
 from sqlalchemy import Column
+from sqlalchemy import Integer
 from sqlalchemy import Float
+from sqlalchemy import Boolean
 from sqlalchemy import ForeignKey
 from sqlalchemy import Text
+from sqlalchemy import func
+from sqlalchemy.orm import relationship
 
 
 class Product(BaseModel, Base):
@@ -27,6 +32,99 @@ class Product(BaseModel, Base):
     customer_id = Column(String(60), ForeignKey('customers.id'), nullable=False)
     price = Column(Float)
     rate = Column(Float, default=0.0)
+    review_count = Column(Integer, default=0)
+    is_available = Column(Boolean, nullable=False, default=True)
+    stock_quantity = Column(Integer, default=0)
     # must put 'default' attribute as an default image for the product
     product_image = Column(Text)
-    # category_id  = Column(String(60), ForeignKey('categories.id'), nullable=False)
\ No newline at end of file
+    category_id = Column(String(60), ForeignKey('categories.id'))
+    # explicit many-to-one: the Customer-side relationship of the
+    # baseline is shadowed by the products @property, so the backref
+    # it would have created never exists.
+    customer = relationship('Customer')
+
+    def check_stock_availability(self, quantity=1):
+        """
+            Return True if the product is available with enough stock,
+            a plain boolean load instead of a string compare.
+        """
+        return bool(self.is_available) and \
+            (self.stock_quantity or 0) >= quantity
+
+    def update_stock(self, quantity_change):
+        """
+            Adjust the stock quantity and flip availability when the
+            stock crosses zero.
+        """
+        self.stock_quantity = (self.stock_quantity or 0) + quantity_change
+        if self.stock_quantity <= 0:
+            self.stock_quantity = 0
+            self.is_available = False
+        elif not self.is_available:
+            self.is_available = True
+        return self.stock_quantity
+
+    def calculate_average_rating(self):
+        """
+            Return the average rating of the product. The value is
+            maintained incrementally by review events, so this is an
+            O(1) read with no review query.
+        """
+        return round(self.rate or 0.0, 2)
+
+    def recalculate_rating(self, commit=False):
+        """
+            Repair the maintained rating columns from one SQL
+            aggregate. Nothing is committed unless requested, so batch
+            recompute flows can iterate products and flush once at the
+            end instead of once per product.
+        """
+        from modules.Review.review import Review
+
+        average, count = modules.storage.session.query(
+            func.coalesce(func.avg(Review.rate), 0.0),
+            func.count(Review.id)).filter(
+                Review.product_id == self.id,
+                Review.is_approved.is_(True)).one()
+        self.rate = round(float(average), 2)
+        self.review_count = count
+        if commit:
+            self.save()
+        return self.rate
+
+    def get_recent_reviews(self, limit=5):
+        """
+            Return the newest approved reviews of the product, with
+            filter, sort and limit pushed to the indexed SQL query and
+            the review relations eagerly joined.
+        """
+        from modules.Review.review import Review
+
+        return Review.get_reviews_for_product(self.id, limit=limit)
+
+    def get_review_summary(self):
+        """
+            Return the rating distribution, total and average of the
+            product from one grouped query.
+        """
+        from modules.Review.review import Review
+
+        return Review.get_summary_for_product(self.id)
+
+    def to_dict(self):
+        """Returns dictionary representation of the product with its
+        review summary, fetched in a single grouped query"""
+        product_dict = super().to_dict()
+        product_dict['review_summary'] = self.get_review_summary()
+        return product_dict
+
+    def has_customer_reviewed(self, customer_id):
+        """
+            Return True if the customer already reviewed the product,
+            checked with a single indexed EXISTS-style lookup.
+        """
+        from modules.Review.review import Review
+
+        return modules.storage.session.query(Review.id).filter_by(
+            product_id=self.id,
+            customer_id=customer_id).first() is not None
\ No newline at end of file
@@ -1,11 +1,90 @@
 #!/usr/bin/env python3
 """Create Review Class"""
+import re
+from functools import lru_cache
+import modules
 from modules.baseModel import BaseModel
 from modules.baseModel import Base
 from sqlalchemy import String
 from sqlalchemy import Column
 from sqlalchemy import Float
+from sqlalchemy import Integer
+from sqlalchemy import Boolean
 from sqlalchemy import ForeignKey
+from sqlalchemy import Index
+from sqlalchemy import case
+from sqlalchemy import event
+from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import relationship
+from modules.Products.product import Product
+
+
+# in-process rating summary cache. Reviews change far less often than
+# product pages are viewed, so summaries are memoized per product and
+# tagged with a version that the review event hooks bump; a stale
+# entry becomes unreachable the moment its product's reviews change.
+_rating_cache = {}
+_rating_version = {}
+
+# blocked terms for review text. The list is folded into one compiled
+# alternation so a validation is a single O(length) scan instead of
+# one substring search per term.
+# all ~10 possible star strings (half-star steps from 0.0 to 5.0),
+# precomputed once so serialization does a dict lookup instead of
+# string arithmetic per review.
+_STAR_TABLE = {
+    half_steps / 2: ('★' * (half_steps // 2) + '⯨' * (half_steps % 2) +
+                     '☆' * (5 - half_steps // 2 - half_steps % 2))
+    for half_steps in range(0, 11)}
+
+PROFANITY_WORDS = ('damn', 'hell', 'crap', 'scam', 'fraud', 'ripoff')
+_PROFANITY_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, PROFANITY_WORDS)) + r')\b',
+    re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _validate_text_cached(text):
+    """
+        Validation kernel behind Review.validate_text. Pure in its
+        input, so results are held in a bounded LRU; the cache must
+        be cleared if PROFANITY_WORDS is ever changed at runtime.
+        Checks are ordered cheapest first so invalid input is
+        rejected before any scanning.
+    """
+    # the raw length bounds the stripped one from above, so only the
+    # too-short rejection can be decided without stripping; leading
+    # and trailing whitespace can be arbitrarily long, so every other
+    # check needs the stripped length (one C call).
+    if len(text) < 10:
+        return False
+    stripped_length = len(text.strip())
+    if stripped_length < 10 or stripped_length > 2000:
+        return False
+    # the compiled pattern folds case itself, so no lowercase copy
+    # of the text is ever allocated.
+    return _PROFANITY_RE.search(text) is None
+
+
+@lru_cache(maxsize=64)
+def _validate_rating_str(rating):
+    """
+        Parse-and-bound-check fallback for string ratings, memoized
+        because the same few form values repeat endlessly.
+    """
+    try:
+        value = float(rating)
+    except ValueError:
+        return False
+    return 1.0 <= value <= 5.0
+
+
+def _invalidate_rating_cache(product_id):
+    """Drop the cached summary of a product and bump its version"""
+    _rating_version[product_id] = _rating_version.get(product_id, 0) + 1
+    _rating_cache.pop(product_id, None)
 
 
 class Review(BaseModel, Base):
@@ -17,11 +96,264 @@ class Review(BaseModel, Base):
             product_id(str):
             customer(str):
             rate(float):
+            is_approved(bool):
     """
     __tablename__ = 'reviews'
+    _FIELDS = ('id', 'created_at', 'updated_at', 'text', 'product_id',
+               'customer_id', 'rate', 'is_approved', 'helpful_count')
     text = Column(String(2048))
     product_id = Column(String(60), ForeignKey('products.id'), nullable=False)
     customer_id = Column(String(60), ForeignKey('customers.id'), nullable=False)
     rate = Column(Float, default=0.0)
+    is_approved = Column(Boolean, default=True)
+    helpful_count = Column(Integer, default=0)
+    customer = relationship('Customer')
+    product = relationship('Product')
+
+    @classmethod
+    def get_reviews_for_product(cls, product_id, limit=None):
+        """
+            Return the newest approved reviews of a product with the
+            customer and product relations joined in the same query,
+            so serializing the list issues no per-review SELECTs.
+        """
+        query = modules.storage.session.query(cls).options(
+            joinedload(cls.customer), joinedload(cls.product)).filter_by(
+                product_id=product_id, is_approved=True).order_by(
+                    cls.created_at.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_rating_stars(self):
+        """
+            Return the star string of the rating, looked up in the
+            precomputed half-step table.
+        """
+        return _STAR_TABLE.get(round((self.rate or 0.0) * 2) / 2,
+                               '☆☆☆☆☆')
+
+    def to_dict(self):
+        """Returns dictionary representation of the review, built
+        from a fixed field list in a single dict"""
+        review_dict = {key: getattr(self, key) for key in self._FIELDS}
+        review_dict['__class__'] = 'Review'
+        review_dict['created_at'] = self.created_at.isoformat()
+        review_dict['updated_at'] = self.updated_at.isoformat()
+        review_dict['rating_stars'] = self.get_rating_stars()
+        # hasattr on a mapped attribute is always True and fires the
+        # very lazy load the guard exists to avoid; a __dict__ probe
+        # sees only relations that are already loaded.
+        if 'customer' in self.__dict__ and self.customer:
+            review_dict['customer_name'] = self.customer.first_name
+        if 'product' in self.__dict__ and self.product:
+            review_dict['product_name'] = self.product.product_name
+        return review_dict
+
+    def add_helpful_vote(self):
+        """
+            Count one helpful vote with a single atomic UPDATE — no
+            row hydration and safe under concurrent vote bursts.
+        """
+        session = modules.storage.session
+        session.query(Review).filter(Review.id == self.id).update(
+            {Review.helpful_count: func.coalesce(Review.helpful_count,
+                                                 0) + 1},
+            synchronize_session=False)
+        session.commit()
+        session.expire(self, ['helpful_count'])
+        return self.helpful_count
+
+    @staticmethod
+    def validate_text(text):
+        """
+            Validate review text: must be a reasonably sized string
+            and pass the profanity scan. Results are memoized, so a
+            draft resubmitted by a client retry or preview-then-save
+            flow is scanned only once.
+        """
+        if not isinstance(text, str):
+            return False
+        return _validate_text_cached(text)
+
+    @staticmethod
+    def validate_rating(rating):
+        """
+            Validate a rating value. Numbers — the common case — are
+            bound-checked directly with no float() parse and no
+            exception machinery; only strings fall through to the
+            cached parser.
+        """
+        if isinstance(rating, (int, float)) and \
+                not isinstance(rating, bool):
+            return 1.0 <= rating <= 5.0
+        if isinstance(rating, str):
+            return _validate_rating_str(rating)
+        return False
+
+    @staticmethod
+    def _empty_summary():
+        """Return a fresh zeroed rating summary dict"""
+        return {'distribution': {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
+                'total': 0, 'average': 0.0}
+
+    @staticmethod
+    def _fold_rating(summary, rate, count):
+        """Fold one (rate, count) group row into a summary dict"""
+        bucket = min(5, max(1, int(round(rate or 0))))
+        summary['distribution'][bucket] += count
+        summary['total'] += count
+        summary['average'] += (rate or 0.0) * count
+
+    @staticmethod
+    def _finish_summary(summary):
+        """Turn the accumulated rating sum into the average"""
+        if summary['total']:
+            summary['average'] = round(summary['average'] /
+                                       summary['total'], 2)
+        return summary
+
+    @classmethod
+    def get_summary_for_product(cls, product_id):
+        """
+            Return rating distribution, total and average for one
+            product from a single grouped query.
+        """
+        version = _rating_version.get(product_id, 0)
+        cached = _rating_cache.get(product_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        rows = modules.storage.session.query(
+            cls.rate, func.count()).filter_by(
+                product_id=product_id, is_approved=True).group_by(
+                    cls.rate).all()
+        summary = cls._empty_summary()
+        for rate, count in rows:
+            cls._fold_rating(summary, rate, count)
+        cls._finish_summary(summary)
+        _rating_cache[product_id] = (version, summary)
+        return summary
+
+    @classmethod
+    def get_average_rating_for_product(cls, product_id):
+        """
+            Return the average approved rating of a product, served
+            from the cached summary; no review rows are hydrated.
+        """
+        return cls.get_summary_for_product(product_id)['average']
+
+    @classmethod
+    def get_rating_distribution_for_product(cls, product_id):
+        """
+            Return the {1..5: count} rating distribution of a product,
+            grouped in the database.
+        """
+        return cls.get_summary_for_product(product_id)['distribution']
+
+    @classmethod
+    def stream_rates_for_product(cls, product_id, batch_size=1000):
+        """
+            Stream the approved rating values of a product in fixed
+            batches. The SQL aggregates above cover the standard
+            average; this is for computations the database cannot
+            express (custom weighting), keeping peak memory at one
+            batch instead of materializing every rate.
+        """
+        query = modules.storage.session.query(cls.rate).filter(
+            cls.product_id == product_id,
+            cls.is_approved.is_(True)).execution_options(
+                stream_results=True, yield_per=batch_size)
+        for (rate,) in query:
+            yield rate
+
+    @classmethod
+    def get_summary_for_products(cls, product_ids):
+        """
+            Return rating summaries for many products at once with a
+            single grouped IN-clause query, one entry per product id.
+        """
+        summaries = {product_id: cls._empty_summary()
+                     for product_id in product_ids}
+        rows = modules.storage.session.query(
+            cls.product_id, cls.rate, func.count()).filter(
+                cls.product_id.in_(product_ids),
+                cls.is_approved.is_(True)).group_by(
+                    cls.product_id, cls.rate).all()
+        for product_id, rate, count in rows:
+            cls._fold_rating(summaries[product_id], rate, count)
+        for summary in summaries.values():
+            cls._finish_summary(summary)
+        return summaries
+
+
+# created_at is indexed descending so the recent-reviews query walks
+# the index in order and skips the sort step entirely.
+Index('ix_reviews_product_approved_created',
+      Review.product_id, Review.is_approved, Review.created_at.desc())
+
+
+def _add_rating(connection, product_id, rate):
+    """
+        Fold one new rating into the product's maintained average
+        with a single UPDATE, no review scan.
+    """
+    products = Product.__table__
+    count = func.coalesce(products.c.review_count, 0)
+    connection.execute(products.update().where(
+        products.c.id == product_id).values(
+            rate=(func.coalesce(products.c.rate, 0.0) * count + rate) /
+                 (count + 1),
+            review_count=count + 1))
+
+
+def _remove_rating(connection, product_id, rate):
+    """
+        Remove one rating from the product's maintained average with
+        a single UPDATE, no review scan.
+    """
+    products = Product.__table__
+    count = func.coalesce(products.c.review_count, 0)
+    connection.execute(products.update().where(
+        products.c.id == product_id).values(
+            rate=case((count > 1,
+                       (func.coalesce(products.c.rate, 0.0) * count - rate) /
+                       (count - 1)),
+                      else_=0.0),
+            review_count=case((count > 0, count - 1), else_=0)))
+
+
+@event.listens_for(Review, 'after_insert')
+def _review_after_insert(mapper, connection, target):
+    """Maintain the product average when a review is created"""
+    _invalidate_rating_cache(target.product_id)
+    if target.is_approved:
+        _add_rating(connection, target.product_id, target.rate or 0.0)
+
+
+@event.listens_for(Review, 'after_delete')
+def _review_after_delete(mapper, connection, target):
+    """Maintain the product average when a review is removed"""
+    _invalidate_rating_cache(target.product_id)
+    if target.is_approved:
+        _remove_rating(connection, target.product_id, target.rate or 0.0)
+
+
+@event.listens_for(Review, 'after_update')
+def _review_after_update(mapper, connection, target):
+    """Maintain the product average on rating or approval changes"""
+    _invalidate_rating_cache(target.product_id)
+    state = inspect(target)
+    rate_history = state.attrs.rate.history
+    approved_history = state.attrs.is_approved.history
+    old_rate = rate_history.deleted[0] if rate_history.deleted \
+        else target.rate
+    if approved_history.has_changes():
+        if target.is_approved:
+            _add_rating(connection, target.product_id, target.rate or 0.0)
+        else:
+            _remove_rating(connection, target.product_id, old_rate or 0.0)
+    elif rate_history.has_changes() and target.is_approved:
+        _remove_rating(connection, target.product_id, old_rate or 0.0)
+        _add_rating(connection, target.product_id, target.rate or 0.0)
     
 
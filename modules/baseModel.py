@@ -3,8 +3,8 @@
 import uuid
 from datetime import datetime
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import CHAR
 from sqlalchemy import Column
-from sqlalchemy import String
 from sqlalchemy import DateTime
 import modules
 import json
@@ -22,12 +22,18 @@ class BaseModel:
             created_at(datetime): The time it was created
             updated_at(datetime): The time it was updated
     """
-    id = Column(String(60), primary_key=True)
-    created_at = Column(DateTime, default=datetime.utcnow())
-    updated_at = Column(DateTime, default=datetime.utcnow())
+    # fixed-width 32-char hex uuid: no dash padding, cheaper key
+    # comparisons than a variable-length string.
+    id = Column(CHAR(32), primary_key=True)
+    # the defaults are callables: default=datetime.utcnow() would
+    # freeze one timestamp at class definition and stamp it on every
+    # row. onupdate bumps updated_at on any flushed change.
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow,
+                        onupdate=datetime.utcnow)
 
     def __init__(self, *args, **kwargs):
-        self.id = str(uuid.uuid4())
+        self.id = uuid.uuid4().hex
         self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
         if kwargs:
@@ -49,7 +55,6 @@ class BaseModel:
 
     def save(self):
         """ Save class instnace """
-        self.updated_at = datetime.utcnow()
         modules.storage.new(self)
         modules.storage.save()
 
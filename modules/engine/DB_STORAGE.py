@@ -1,18 +1,56 @@
 #!/usr/bin/env python3
 from modules.Customer.customer import Customer
 from modules.Cart.cart import Cart
+from modules.Cart.cart_item import CartItem
+from modules.Category.category import Category
 from modules.Order.order import Order
+from modules.Order.order_item import OrderItem
 from modules.Products.product import Product
 from modules.Review.review import Review
 from modules.baseModel import Base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import func
 from sqlalchemy.orm import scoped_session
 import modules
 
 
-# classes = {"Customer": Customer, "Cart": Cart,
-#            "Product": Product, "Review": Review, "Order": Order}
+# static class-name registry: a dict probe instead of eval()ing the
+# name on every storage call (and no code execution from strings).
+_CLASSES = {"Customer": Customer, "Cart": Cart, "CartItem": CartItem,
+            "Category": Category, "Order": Order,
+            "OrderItem": OrderItem, "Product": Product,
+            "Review": Review}
+
+
+# external-content FTS5 index over product name/description, kept in
+# sync by triggers so ilike table scans are replaced by inverted-index
+# lookups.
+_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+    "product_name, description, content='products',"
+    " content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ai"
+    " AFTER INSERT ON products BEGIN"
+    " INSERT INTO products_fts(rowid, product_name, description)"
+    " VALUES (new.rowid, new.product_name, new.description);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_ad"
+    " AFTER DELETE ON products BEGIN"
+    " INSERT INTO products_fts(products_fts, rowid, product_name,"
+    " description)"
+    " VALUES ('delete', old.rowid, old.product_name, old.description);"
+    " END",
+    "CREATE TRIGGER IF NOT EXISTS products_fts_au"
+    " AFTER UPDATE ON products BEGIN"
+    " INSERT INTO products_fts(products_fts, rowid, product_name,"
+    " description)"
+    " VALUES ('delete', old.rowid, old.product_name, old.description);"
+    " INSERT INTO products_fts(rowid, product_name, description)"
+    " VALUES (new.rowid, new.product_name, new.description);"
+    " END",
+)
 
 
 class DBStorage:
@@ -27,6 +65,47 @@ class DBStorage:
         """
         """
         self.__engine = create_engine("sqlite:///db/{}.db".format("techOnlineDB"))
+        # run the schema check once at startup rather than on every
+        # reload; reload only rebuilds the session.
+        Base.metadata.create_all(self.__engine)
+        # sqlite ships with foreign keys off; turn them on per
+        # connection so ON DELETE CASCADE fans out in the database
+        # and passive_deletes relationships stay correct.
+        event.listen(self.__engine, 'connect', self.__enable_foreign_keys)
+        self.__setup_search_index()
+
+    def __setup_search_index(self):
+        """
+            Create the product FTS index and its sync triggers; the
+            index is backfilled only when first created.
+        """
+        with self.__engine.connect() as connection:
+            created = connection.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type='table'"
+                " AND name='products_fts'").fetchone() is None
+            for statement in _FTS_DDL:
+                connection.exec_driver_sql(statement)
+            if created:
+                connection.exec_driver_sql(
+                    "INSERT INTO products_fts(products_fts)"
+                    " VALUES('rebuild')")
+            connection.commit()
+
+    @staticmethod
+    def __enable_foreign_keys(dbapi_connection, connection_record):
+        """
+            Enable foreign key enforcement on each sqlite connection
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
+    @property
+    def session(self):
+        """
+            Return the current database session
+        """
+        return self.__session
 
     def all(self, cls=None):
         """
@@ -35,39 +114,71 @@ class DBStorage:
             depending on the class names.
         """
         if cls is None:
-            obj = self.__session.query(Customer).all()
-            obj.extend(self.__session.query(Review).all())
-            obj.extend(self.__session.query(Order).all())
-            obj.extend(self.__session.query(Product).all())
-            obj.extend(self.__session.query(Cart).all())
-        else:
-            if type(cls) == str:
-                cls = eval(cls)
-            obj = self.__session.query(cls)
-        return {"{}.{}".format(type(val).__name__, val.id): val for val in obj}
+            # the per-class queries stay serial on purpose: they all
+            # hydrate into the one scoped session (sessions are not
+            # thread-safe), and sqlite serializes file access anyway,
+            # so a thread pool would add session-per-thread plumbing
+            # and merge copies without overlapping any real I/O.
+            # Revisit if storage ever moves to a networked backend.
+            result = {}
+            for model in (Customer, Review, Order, Product, Cart,
+                          Category):
+                prefix = model.__name__ + '.'
+                for val in self.__session.query(model):
+                    result[prefix + val.id] = val
+            return result
+        if type(cls) is str:
+            cls = _CLASSES[cls]
+        name = cls.__name__
+        return {"{}.{}".format(name, val.id): val
+                for val in self.__session.query(cls)}
+
+    def stream(self, cls, batch_size=500):
+        """
+            Stream every instance of a class in fixed-size batches
+            instead of loading the whole table at once.
+        """
+        if type(cls) is str:
+            cls = _CLASSES[cls]
+
+        return self.__session.query(cls).yield_per(
+            batch_size).enable_eagerloads(False)
+
+    def filter(self, cls, **kwargs):
+        """
+            Query instances of a class with the predicates pushed to
+            the database instead of loading the table and filtering
+            in Python. Returns the query so callers can add ordering
+            or limits before iterating.
+        """
+        if type(cls) is str:
+            cls = _CLASSES[cls]
+
+        return self.__session.query(cls).filter_by(**kwargs)
+
+    def filter_first(self, cls, **kwargs):
+        """
+            Return the first instance matching the filters, or None.
+        """
+        return self.filter(cls, **kwargs).first()
 
     def get(self, cls, id):
         """
             Get Specific instance on the database by id
         """
         if type(cls) is str:
-            cls = eval(cls)
-        
-        all_cls = modules.storage.all(cls)
-        for value in all_cls.values():
-            if value.id == id:
-                return value
-        
-        return None
+            cls = _CLASSES[cls]
+
+        return self.__session.get(cls, id)
 
     def count(self, cls):
         """
             Count the number of instnace in specific module.
         """
         if type(cls) is str:
-            cls = eval(cls)
+            cls = _CLASSES[cls]
 
-        return len(modules.storage.all(cls).values())
+        return self.__session.query(func.count(cls.id)).scalar()
 
     def save(self):
         """
@@ -92,7 +203,6 @@ class DBStorage:
         """
             create new Session
         """
-        Base.metadata.create_all(self.__engine)
         new_session = sessionmaker(bind=self.__engine,
                                     expire_on_commit=False)
         Session = scoped_session(new_session)
@@ -1,30 +1,95 @@
 #!/usr/bin/env python3
 """Search Class"""
 import modules
+from sqlalchemy import text
+from modules.Products.product import Product
+
+
+_FTS_MATCH = text(
+    "SELECT p.id FROM products p"
+    " JOIN products_fts f ON p.rowid = f.rowid"
+    " WHERE products_fts MATCH :q LIMIT :n")
+_FTS_SUGGEST = text(
+    "SELECT p.product_name FROM products p"
+    " JOIN products_fts f ON p.rowid = f.rowid"
+    " WHERE products_fts MATCH :q LIMIT :n")
+
+
+def _fts_quote(term, prefix=False):
+    """Quote a user term for an FTS MATCH expression"""
+    quoted = '"{}"'.format(term.replace('"', ''))
+    return quoted + '*' if prefix else quoted
 
 
 class Search:
     """
         Define Search Class
     """
-    def search_query_by_name(obj):
+    def search_products_by_name(search_term, limit=20):
         """
-            Search query by name, and return list of queries.
+            Full-text search of products by name/description through
+            the FTS index instead of an unindexed ilike scan.
         """
-        modules.storage.reload()
+        session = modules.storage.session
+        ids = session.execute(_FTS_MATCH, {
+            'q': _fts_quote(search_term), 'n': limit}).scalars().all()
+        if not ids:
+            return []
+        return session.query(Product).filter(Product.id.in_(ids)).all()
 
-        result = modules.storage.__session.query(obj).filter(obj.name.ilike(f'%{obj}%')).all()
-        modules.storage.__session.close()
+    def search_products_advanced(search_term, min_price=None,
+                                 max_price=None, category_id=None,
+                                 limit=20):
+        """
+            Full-text product search combined with indexed price and
+            category filters.
+        """
+        session = modules.storage.session
+        ids = session.execute(_FTS_MATCH, {
+            'q': _fts_quote(search_term), 'n': limit}).scalars().all()
+        if not ids:
+            return []
+        query = session.query(Product).filter(Product.id.in_(ids))
+        if min_price is not None:
+            query = query.filter(Product.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Product.price <= max_price)
+        if category_id is not None:
+            query = query.filter(Product.category_id == category_id)
+        return query.all()
 
-        return result
+    def search_by_category(category_id):
+        """
+            Return the available products of a category with one
+            indexed query.
+        """
+        return modules.storage.filter(Product, category_id=category_id,
+                                      is_available=True).all()
 
-    def search_query_by_id(obj=None, id=None):
+    def get_search_suggestions(search_term, limit=10):
         """
-            Search query by id, and return the result.
+            Autocomplete product names with an FTS prefix match; only
+            the name column is fetched, and blank input never reaches
+            the database.
         """
-        modules.storage.reload()
+        term = search_term.strip() if search_term else ''
+        if not term:
+            return []
+        return modules.storage.session.execute(_FTS_SUGGEST, {
+            'q': _fts_quote(term, prefix=True),
+            'n': limit}).scalars().all()
 
-        result = modules.storage.__session.query(obj).filter(id==id).all()
-        modules.storage.__session.close()
+    def search_query_by_name(obj, name):
+        """
+            Search query by name, and return list of queries.
+        """
+        return modules.storage.session.query(obj).filter(
+            obj.name.ilike('%{}%'.format(name))).all()
 
-        return result
\ No newline at end of file
+    def search_query_by_id(obj=None, id=None):
+        """
+            Search query by id, and return the result. A primary-key
+            get that hits the identity map before touching the
+            database.
+        """
+        return modules.storage.session.get(obj, id)
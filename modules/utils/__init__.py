@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+from .error_handler import APIErrorHandler
+from .error_handler import error_handler
+from .error_handler import handle_api_error
+
+# names served lazily from .file_handler via PEP 562: that module
+# pulls in PIL, which processes that never touch uploads should not
+# pay for at import time.
+_FILE_HANDLER_EXPORTS = ('FileHandler', 'file_handler', 'allowed_file',
+                         'save_uploaded_file', 'delete_uploaded_file')
+
+__all__ = ['APIErrorHandler', 'error_handler', 'handle_api_error',
+           'FileHandler', 'file_handler', 'allowed_file',
+           'save_uploaded_file', 'delete_uploaded_file']
+
+
+def __getattr__(name):
+    """Resolve the file handling exports on first access"""
+    if name in _FILE_HANDLER_EXPORTS:
+        from importlib import import_module
+        module = import_module('.file_handler', __name__)
+        # rebind after the import: the import system sets the package
+        # attribute 'file_handler' to the submodule, which would
+        # shadow the proxy of the same name.
+        for export in _FILE_HANDLER_EXPORTS:
+            globals()[export] = getattr(module, export)
+        return globals()[name]
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""API response and error handling helpers"""
+import atexit
+import json
+import logging
+import queue
+import time
+import traceback
+from collections import defaultdict
+from functools import wraps
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+from flask import Response
+from flask import g
+from flask import has_request_context
+
+try:
+    import orjson
+
+    def _json_response(payload, status_code):
+        """Serialize a payload with orjson's native encoder"""
+        return Response(orjson.dumps(payload), status=status_code,
+                        mimetype='application/json')
+except ImportError:
+    def _json_response(payload, status_code):
+        """Serialize a payload with the stdlib encoder"""
+        return Response(json.dumps(payload, default=str),
+                        status=status_code,
+                        mimetype='application/json')
+
+
+def _iso_utc():
+    """
+        Format the current UTC time as an ISO-8601 string straight
+        from the epoch clock: no datetime object is built (utcnow is
+        also deprecated since 3.12) and strftime does the formatting
+        in C.
+    """
+    now = time.time()
+    seconds = int(now)
+    return '{}.{:06d}'.format(
+        time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds)),
+        int((now - seconds) * 1e6))
+
+
+def _now_iso():
+    """
+        Return the response timestamp, computed at most once per
+        request: every envelope built while handling one request
+        shares the same instant instead of re-formatting it per
+        response part.
+    """
+    if has_request_context():
+        timestamp = g.get('_response_timestamp')
+        if timestamp is None:
+            timestamp = g._response_timestamp = _iso_utc()
+        return timestamp
+    return _iso_utc()
+
+
+def _queue_buffered_logger():
+    """
+        Return the api logger with its handlers moved behind a queue.
+        Emitting a record is then one in-memory put on the request
+        path; a single background listener thread drains the queue
+        into the real handlers, so a slow file or network handler no
+        longer stalls every error response. The listener is stopped
+        at exit so buffered records are flushed.
+    """
+    logger = logging.getLogger('techonline.api')
+    if any(isinstance(handler, QueueHandler)
+           for handler in logger.handlers):
+        return logger
+    handlers = logger.handlers[:] or [logging.StreamHandler()]
+    for handler in handlers:
+        logger.removeHandler(handler)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers,
+                             respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(QueueHandler(log_queue))
+    return logger
+
+
+class APIErrorHandler:
+    """
+        APIErrorHandler Class:
+            Build the JSON envelopes every API endpoint returns.
+            Serialization goes straight through orjson (stdlib json
+            when unavailable) instead of jsonify, so large paginated
+            payloads are encoded in native code.
+    """
+    def __init__(self):
+        self.logger = _queue_buffered_logger()
+
+    def success_response(self, data=None, message='', status_code=200):
+        """
+            Build a success envelope around the given data.
+        """
+        response = {'success': True,
+                    'message': message,
+                    'data': data,
+                    'timestamp': _now_iso()}
+        return _json_response(response, status_code)
+
+    def error_response(self, message, status_code=400, error_code=None,
+                       field_errors=None):
+        """
+            Build a client error envelope and log it.
+        """
+        response = {'success': False,
+                    'error': {'message': message,
+                              'code': error_code,
+                              'field_errors': field_errors},
+                    'timestamp': _now_iso()}
+        self.logger.error('API error %s: %s', status_code, message)
+        return _json_response(response, status_code)
+
+    def paginated_response(self, items, page, per_page, total,
+                           message=''):
+        """
+            Build a success envelope carrying one page of items plus
+            pagination metadata.
+        """
+        pages = (total + per_page - 1) // per_page if per_page else 0
+        response = {'success': True,
+                    'message': message,
+                    'data': items,
+                    'pagination': {'page': page,
+                                   'per_page': per_page,
+                                   'total': total,
+                                   'pages': pages},
+                    'timestamp': _now_iso()}
+        return _json_response(response, 200)
+
+    def system_error_response(self, message='Internal server error',
+                              status_code=500,
+                              include_traceback=False):
+        """
+            Build a server error envelope, optionally exposing the
+            traceback for debugging.
+        """
+        response = {'success': False,
+                    'error': {'message': message, 'code': 'SYSTEM_ERROR'},
+                    'timestamp': _now_iso()}
+        if include_traceback:
+            response['error']['traceback'] = traceback.format_exc()
+        # exc_info hands the logging machinery the live exception; it
+        # walks and formats the stack only if a handler actually
+        # renders the record, instead of format_exc() doing that work
+        # up front on every system error.
+        self.logger.error('System error: %s', message, exc_info=True)
+        return _json_response(response, status_code)
+
+    def create_field_errors_dict(self, validation_result):
+        """
+            Group 'field: message' validation errors by field name.
+            str.partition splits in one C call; everything here is
+            string-and-dict work bound by interpreter overhead, so
+            C-level str methods are the right tool — a JIT compiler
+            such as Numba has nothing to offer code like this.
+        """
+        field_errors = defaultdict(list)
+        for error in validation_result.get('errors') or ():
+            field_name, separator, message = error.partition(':')
+            if separator:
+                field_errors[field_name.strip().lower()
+                             .replace(' ', '_')].append(message.strip())
+            else:
+                field_errors['general'].append(error)
+        return dict(field_errors) or None
+
+    def handle_exception(self, error):
+        """
+            Map an unhandled exception to the right error envelope.
+        """
+        if isinstance(error, ValueError):
+            return self.error_response(str(error), status_code=400,
+                                       error_code='VALIDATION_ERROR')
+        return self.system_error_response(str(error))
+
+
+error_handler = APIErrorHandler()
+
+
+def handle_api_error(func, _handle=error_handler.handle_exception):
+    """
+        Route decorator funneling unhandled exceptions through the
+        shared error handler. The bound handler method is captured at
+        decoration time, skipping the two attribute lookups per call;
+        functools.wraps carries the full metadata Flask and debuggers
+        read, not just __name__.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as error:
+            return _handle(error)
+    return wrapper